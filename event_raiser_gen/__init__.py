@@ -2,8 +2,10 @@ from .raiser_gen import (
     generate_event_raisers,
     clear_event_registry,
     get_event_registry,
+    unregister_event_callback,
     EventOf,
-    EventDict
+    EventDict,
+    EventSpec
 )
 from .scheduler import EventScheduler
 
@@ -11,7 +13,9 @@ __all__ = [
     "generate_event_raisers",
     "clear_event_registry",
     "get_event_registry",
+    "unregister_event_callback",
     "EventOf",
     "EventDict",
+    "EventSpec",
     "EventScheduler"
 ]
\ No newline at end of file
@@ -0,0 +1,24 @@
+# cython: language_level=3
+"""
+Optional native dispatch loops for the generated event raisers.
+
+Build in place with `cythonize -i event_raiser_gen/_dispatch.pyx`; when the compiled
+module is missing, the raisers run their pure Python loops instead.
+"""
+
+
+cpdef void call_all(tuple callbacks, tuple args) except *:
+    """Call every callback with the given arguments, letting errors propagate"""
+    cdef object callback
+    for callback in callbacks:
+        callback(*args)
+
+
+cpdef void call_all_guarded(tuple callbacks, tuple args, object log_exc, str error_message) except *:
+    """Call every callback with the given arguments, reporting errors and moving on"""
+    cdef object callback
+    for callback in callbacks:
+        try:
+            callback(*args)
+        except Exception:
+            log_exc(error_message)
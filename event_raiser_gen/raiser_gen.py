@@ -1,102 +1,416 @@
-from typing import Callable, Any, TypeAlias, TypeVarTuple, Unpack, Awaitable
+from typing import Callable, Any, TypeAlias, TypeVarTuple, Unpack, Awaitable, Literal, Mapping
+from dataclasses import dataclass
+from textwrap import indent
+from types import MappingProxyType
+from threading import Lock
+import weakref
+import asyncio
+import functools
 import inspect
+import keyword
+import logging
+import os
 
 _EventParams: TypeAlias = list[tuple[str, Any]]
 _ModuleGlobals: TypeAlias = dict[str, Any]
 _NestedCallable: TypeAlias = Callable[[Callable], Callable]
-# Extended event registry supporting synchronous and asynchronous callbacks
-_EventRegistry: TypeAlias = dict[str, list[Callable[..., Any | Awaitable[Any]]]]
+_EventKind: TypeAlias = Literal["sync", "async", "mixed"]
+# Read-only view of the event registry supporting synchronous and asynchronous callbacks
+_EventRegistry: TypeAlias = Mapping[str, tuple[Callable[..., Any | Awaitable[Any]], ...]]
 
 _Args = TypeVarTuple("_Args")
 # Extended event callback type - supports async functions
 EventOf: TypeAlias = Callable[[Unpack[_Args]], None | Awaitable[None]]
-EventDict: TypeAlias = dict[str, _EventParams]
 
-_event_registry: _EventRegistry = {}
 
+@dataclass
+class EventSpec:
+    """
+    Event definition with a hint about the kind of callbacks the event accepts.
 
-def generate_event_raisers(events: EventDict, module_globals: _ModuleGlobals) -> None:
+    Only the raisers needed by the kind are generated: `"sync"` events accept sync callbacks
+    only and get no async raiser, `"async"` events get no sync raiser, and `"mixed"` events
+    (the default, also used for plain parameter lists) get both.
+    """
+    params: _EventParams
+    kind: _EventKind = "mixed"
+
+
+EventDict: TypeAlias = dict[str, _EventParams | EventSpec]
+
+_log = logging.getLogger(__name__)
+
+# Optional compiled dispatch loops (see `_dispatch.pyx`), used by the raisers when available
+try:
+    from ._dispatch import call_all as _call_all, call_all_guarded as _call_all_guarded
+except ImportError:
+    _call_all = _call_all_guarded = None
+# The compiled loops only pay off for larger fan-outs: with fewer sync callbacks than this
+# their argument-tuple packing and call overhead make them slower than the Python loops
+_NATIVE_DISPATCH_MIN_CALLBACKS = 10
+
+# Set EVENT_RAISER_NO_SIGNATURE=1 to skip attaching annotated signatures to generated raisers
+_NO_SIG = os.environ.get("EVENT_RAISER_NO_SIGNATURE") == "1"
+
+
+
+class _EventCallbacks:
+    """
+    Holds all callback state of one event, shared by its decorator and raisers.
+    """
+    __slots__ = ("kind", "callbacks", "sync_safe", "sync_guarded", "async_safe", "async_guarded",
+                 "rebinders", "async_warning", "async_warned", "lock")
+
+    def __init__(self, name: str) -> None:
+        # Kind of the last generated raisers, which decides whether async callbacks are accepted
+        self.kind: _EventKind = "mixed"
+        # All callbacks in registration order, as exposed by `get_event_registry()`, each with
+        # the classified list it was added to
+        self.callbacks: list[tuple[Callable[..., Any], list[Callable[..., Any]]]] = []
+        # Callbacks classified once at registration time
+        self.sync_safe: list[Callable[..., Any]] = []
+        self.sync_guarded: list[Callable[..., Any]] = []
+        self.async_safe: list[Callable[..., Awaitable[Any]]] = []
+        self.async_guarded: list[Callable[..., Awaitable[Any]]] = []
+        # Functions rebinding the tuple snapshots iterated by each generated set of raisers; the
+        # raisers keep their rebinder alive, so regenerated raisers drop out once collected
+        self.rebinders: weakref.WeakSet[Callable[..., None]] = weakref.WeakSet()
+        # Logged by the sync raiser when async callbacks are registered, once until cleared
+        self.async_warning = f"Async callback in sync raiser '{name}' - will not be awaited"
+        self.async_warned = False
+        # Serializes changes so that the last rebind always installs the latest snapshots
+        self.lock = Lock()
+
+    def snapshots(self) -> tuple[Any, ...]:
+        # The last item selects the compiled sync dispatch loops for this many callbacks
+        native = (_call_all is not None
+                  and len(self.sync_safe) + len(self.sync_guarded) >= _NATIVE_DISPATCH_MIN_CALLBACKS)
+        return (tuple(self.sync_safe), tuple(self.sync_guarded), tuple(self.async_safe), tuple(self.async_guarded),
+                native)
+
+    def set_kind(self, kind: _EventKind) -> bool:
+        """Switch to the given kind, unless it is sync-only and async callbacks are registered"""
+        with self.lock:
+            if kind == "sync" and (self.async_safe or self.async_guarded):
+                return False
+            self.kind = kind
+            return True
+
+    def register(self, func: EventOf, is_async: bool, safe: bool) -> bool:
+        """Register the callback, unless it is async and the event is sync-only"""
+        with self.lock:
+            if is_async and self.kind == "sync":
+                return False
+            if is_async:
+                classified = self.async_safe if safe else self.async_guarded
+            else:
+                classified = self.sync_safe if safe else self.sync_guarded
+            classified.append(func)
+            self.callbacks.append((func, classified))
+            self._refresh()
+            return True
+
+    def registered(self) -> tuple[Callable[..., Any], ...]:
+        """All registered callbacks in registration order"""
+        return tuple(func for func, _ in self.callbacks)
+
+    def unregister(self, func: EventOf) -> bool:
+        """Remove the first registration of the callback, returning whether there was one"""
+        with self.lock:
+            for i, (registered, classified) in enumerate(self.callbacks):
+                if registered == func:
+                    del self.callbacks[i]
+                    # Earlier registrations in the same list come first in the registry as well
+                    classified.remove(func)
+                    self._refresh()
+                    return True
+            return False
+
+    def add_rebinder(self, rebind: Callable[..., None]) -> None:
+        with self.lock:
+            self.rebinders.add(rebind)
+            self._refresh()
+
+    def clear(self) -> None:
+        with self.lock:
+            for callbacks in (self.callbacks, self.sync_safe, self.sync_guarded, self.async_safe, self.async_guarded):
+                callbacks.clear()
+            self.async_warned = False
+            self._refresh()
+
+    def _refresh(self) -> None:
+        """Hand fresh tuple snapshots of the callbacks to the raisers (called with the lock held)"""
+        snapshots = self.snapshots()
+        for rebind in self.rebinders:
+            rebind(snapshots)
+
+    def warn_async(self) -> None:
+        if not self.async_warned:
+            self.async_warned = True
+            _log.warning(self.async_warning)
+
+
+_event_callbacks: dict[str, _EventCallbacks] = {}
+
+# Source of the generated raisers: callbacks are called with the event parameters passed
+# positionally by name, so no `*args`/`**kwargs` packing happens on the dispatch path.
+# Safe callbacks run without an error guard. Guarded callbacks share one iterator and the
+# `try` wraps the whole loop, which resumes after the failing callback once the error is
+# reported. Everything the raisers use is bound as a parameter of the enclosing factory,
+# so it is read from a closure cell rather than looked up in globals or builtins. The
+# callbacks are bound as one tuple of snapshots, which `__rebind` replaces on every change
+# and each raiser unpacks once on entry, so a raise never sees a later registration.
+# Only the raisers needed by the event kind are included in the factory.
+# Names starting with "__" are reserved for the generated code.
+_RAISER_FACTORY_TEMPLATE = """
+def __make_raisers(__error_message, __snapshots, __warn_async, __log_exc, __gather, __iter, __len,
+                   __isinstance, __Exception, __BaseException, __call_all, __call_all_guarded):
+    __sync_raiser = __async_raiser = None
+{raisers}
+    def __rebind(__new_snapshots):
+        nonlocal __snapshots
+        __snapshots = __new_snapshots
+
+    return __sync_raiser, __async_raiser, __rebind
+"""
+
+_SYNC_DISPATCH_TEMPLATE = """
+        for __callback in __sync_safe:
+            __callback({params})
+        __callbacks = __iter(__sync_guarded)
+        while True:
+            try:
+                for __callback in __callbacks:
+                    __callback({params})
+                break
+            except __Exception:
+                __log_exc(__error_message)
+"""
+
+# Same as above, running both loops in the compiled dispatch module when the snapshots
+# select it (enough sync callbacks for it to be faster)
+_NATIVE_SYNC_DISPATCH_TEMPLATE = """
+        if __native:
+            __args = {args}
+            __call_all(__sync_safe, __args)
+            __call_all_guarded(__sync_guarded, __args, __log_exc, __error_message)
+        else:{python_dispatch}
+"""
+
+_SYNC_RAISER_TEMPLATE = """
+    def __sync_raiser({params}):
+        __sync_safe, __sync_guarded, __async_safe, __async_guarded, __native = __snapshots{warn_async}{sync_dispatch}
+"""
+
+_WARN_ASYNC_SOURCE = """
+        if __async_safe or __async_guarded:
+            __warn_async()"""
+
+# Async callbacks are started together and awaited with `asyncio.gather`; the guarded
+# ones are wrapped so their errors are reported without affecting the others. Errors of
+# safe callbacks are collected by `gather` and re-raised once every callback has finished,
+# so none is left running after the raiser returns.
+_ASYNC_RAISER_TEMPLATE = """
+    async def __async_raiser({params}):
+        __sync_safe, __sync_guarded, __async_safe, __async_guarded, __native = __snapshots{sync_dispatch}
+        if not (__async_safe or __async_guarded):
+            return
+        # Start every async callback first so that they all run concurrently
+        __coroutines = []
+        __append = __coroutines.append
+        try:
+            for __callback in __async_safe:
+                __append(__callback({params}))
+        except __BaseException:
+            # Do not leave the coroutines created so far unawaited
+            for __coroutine in __coroutines:
+                __coroutine.close()
+            raise
+        __callbacks = __iter(__async_guarded)
+        while True:
+            try:
+                for __callback in __callbacks:
+                    __append(__guarded(__callback({params})))
+                break
+            except __Exception:
+                __log_exc(__error_message)
+        if __len(__coroutines) == 1:
+            await __coroutines[0]
+            return
+        for __result in await __gather(*__coroutines, return_exceptions=True):
+            if __isinstance(__result, __BaseException):
+                raise __result
+
+    async def __guarded(__coroutine):
+        try:
+            await __coroutine
+        except __Exception:
+            __log_exc(__error_message)
+"""
+
+
+def _raiser_source(event_params: _EventParams, kind: str) -> str:
+    """Assemble the source of the raiser factory for an event of the given kind"""
+    params = ", ".join(param_name for param_name, _ in event_params)
+    sync_dispatch = _SYNC_DISPATCH_TEMPLATE.format(params=params).rstrip()
+    if _call_all is not None:
+        args = f"({params},)" if params else "()"
+        sync_dispatch = _NATIVE_SYNC_DISPATCH_TEMPLATE.format(
+            args=args, python_dispatch=indent(sync_dispatch, "    ")
+        ).rstrip()
+    raisers = ""
+    if kind != "async":
+        warn_async = _WARN_ASYNC_SOURCE if kind == "mixed" else ""
+        raisers += _SYNC_RAISER_TEMPLATE.format(params=params, warn_async=warn_async, sync_dispatch=sync_dispatch)
+    if kind != "sync":
+        raisers += _ASYNC_RAISER_TEMPLATE.format(params=params, sync_dispatch=sync_dispatch)
+    return _RAISER_FACTORY_TEMPLATE.format(raisers=raisers)
+
+
+def _check_event_params(event_name: str, params: _EventParams) -> None:
+    """Ensure the parameter names of an event can be used in the generated raiser source"""
+    seen: set[str] = set()
+    for param_name, _ in params:
+        if not param_name.isidentifier() or keyword.iskeyword(param_name) or param_name.startswith("__"):
+            raise ValueError(f"Invalid parameter name {param_name!r} for event '{event_name}'")
+        # Callbacks receive the arguments positionally, so every name must map to one position
+        if param_name in seen:
+            raise ValueError(f"Duplicate parameter name {param_name!r} for event '{event_name}'")
+        seen.add(param_name)
+
+
+# Bounded so that events generated dynamically with ever new parameters do not grow it forever
+@functools.lru_cache(maxsize=256)
+def _cached_signature(params: tuple[tuple[str, Any], ...]) -> inspect.Signature:
+    return inspect.Signature([
+        inspect.Parameter(param_name, inspect.Parameter.POSITIONAL_OR_KEYWORD, annotation=param_type)
+        for param_name, param_type in params
+    ])
+
+
+def _build_signature(params: _EventParams) -> inspect.Signature:
+    """Build the raiser signature of an event, reusing it for events with identical parameters"""
+    params_key = tuple(params)
+    try:
+        return _cached_signature(params_key)
+    except TypeError:
+        # Unhashable annotations cannot be cached
+        return _cached_signature.__wrapped__(params_key)
+
+
+def generate_event_raisers(events: EventDict, module_globals: _ModuleGlobals,
+                           with_signatures: bool = True) -> None:
     """
     Generate corresponding event decorators and trigger functions (sync/async) based on the EVENTS dictionary.
 
-    :param events: Event dictionary, format: `{"event_name": [("param_name", param_type), ...]}`
+    :param events: Event dictionary, format: `{"event_name": [("param_name", param_type), ...]}`;
+        a value may also be an `EventSpec` to restrict the event to sync or async callbacks
     :param module_globals: The global namespace of the module, used to add generated functions
+    :param with_signatures: Whether to attach annotated signatures to the raisers (also disabled by
+        setting the `EVENT_RAISER_NO_SIGNATURE=1` environment variable)
     """
-    for event_name, params in events.items():
+    with_signatures = with_signatures and not _NO_SIG
+    for event_name, spec in events.items():
+        if not isinstance(spec, EventSpec):
+            spec = EventSpec(spec)
+        params, kind = spec.params, spec.kind
+        if kind not in ("sync", "async", "mixed"):
+            raise ValueError(f"Invalid kind {kind!r} for event '{event_name}'")
+        _check_event_params(event_name, params)
+        # The callback state is created once per event and captured by the decorator below;
+        # the raisers iterate tuple snapshots of it, so raising an event never has to look
+        # anything up in the registry and is unaffected by registrations made while it runs
+        event_callbacks = _event_callbacks.get(event_name)
+        if event_callbacks is None:
+            event_callbacks = _EventCallbacks(event_name)
+            _event_callbacks[event_name] = event_callbacks
+        # Regenerating an event may change its kind; the state is shared with earlier raisers
+        if not event_callbacks.set_kind(kind):
+            raise TypeError(f"Event '{event_name}' has async callbacks registered and cannot be made sync-only")
+        # The raisers share one signature object matching the event parameters
+        signature = _build_signature(params) if with_signatures else None
+
         # Generate event decorator for sync/async callbacks
-        def create_decorator(name: str) -> _NestedCallable:
-            def decorator(func: EventOf) -> EventOf:
-                if name not in _event_registry:
-                    _event_registry[name] = []
-                _event_registry[name].append(func)
-                return func
+        def create_decorator(name: str, event_callbacks: _EventCallbacks) -> Callable[..., EventOf | _NestedCallable]:
+            def decorator(func: EventOf | None = None, *, safe: bool = False) -> EventOf | _NestedCallable:
+                def register(func: EventOf) -> EventOf:
+                    # Classify the callback once here instead of on every raise
+                    if not event_callbacks.register(func, inspect.iscoroutinefunction(func), safe):
+                        raise TypeError(f"Async callback registered for sync-only event '{name}'")
+                    return func
+
+                # Support both `@event` and `@event(safe=True)`
+                return register if func is None else register(func)
 
             decorator.__name__ = name
-            decorator.__doc__ = f"Register a callback function (sync/async) for the {name} event"
+            decorator.__doc__ = (f"Register a callback function (sync/async) for the {name} event; "
+                                 f"use `safe=True` to run it without error handling")
             return decorator
 
-        # Generate async event trigger function
-        def create_async_raiser(name: str, event_params: _EventParams) -> Callable[..., Awaitable[None]]:
-            async def async_raiser(*args: Any, **kwargs: Any) -> None:
-                # Iterate through all registered callbacks
-                for callback in _event_registry.get(name, []):
-                    try:
-                        # Execute with 'await' for async callbacks, direct call for sync callbacks
-                        if inspect.iscoroutinefunction(callback):
-                            await callback(*args, **kwargs)
-                        else:
-                            callback(*args, **kwargs)
-                    except Exception as e:
-                        print(f"[NOTICE] Error in event '{name}':", e)
-
-            # Set function signature to match event parameters
-            sig_params = []
-            for param_name, param_type in event_params:
-                sig_params.append(inspect.Parameter(
-                    param_name,
-                    inspect.Parameter.POSITIONAL_OR_KEYWORD,
-                    annotation=param_type
-                ))
-            async_raiser.__signature__ = inspect.Signature(sig_params)
-            async_raiser.__name__ = f"raise_{name}_async"
-            async_raiser.__doc__ = f"Asynchronously trigger the {name} event (supports sync/async callbacks)"
-            return async_raiser
-
-        # Generate synchronous event trigger function
-        def create_sync_raiser(name: str, event_params: _EventParams) -> Callable:
-            def sync_raiser(*args: Any, **kwargs: Any) -> None:
-                for callback in _event_registry.get(name, []):
-                    try:
-                        # Produce a warning for async callbacks in sync raiser
-                        if inspect.iscoroutinefunction(callback):
-                            print(f"[WARNING] Async callback in sync raiser '{name}' - will not be awaited")
-                        callback(*args, **kwargs)
-                    except Exception as e:
-                        print(f"[NOTICE] Error in event '{name}':", e)
-
-            sig_params = []
-            for param_name, param_type in event_params:
-                sig_params.append(inspect.Parameter(
-                    param_name,
-                    inspect.Parameter.POSITIONAL_OR_KEYWORD,
-                    annotation=param_type
-                ))
-            sync_raiser.__signature__ = inspect.Signature(sig_params)
-            sync_raiser.__name__ = f"raise_{name}"
-            sync_raiser.__doc__ = f"Trigger the {name} event (async callbacks are not awaited)"
-            return sync_raiser
-        
+        # Generate sync/async event trigger functions from specialized source code
+        def create_raisers(name: str, event_params: _EventParams, kind: _EventKind,
+                           signature: inspect.Signature | None, event_callbacks: _EventCallbacks
+                           ) -> tuple[Callable | None, Callable[..., Awaitable[None]] | None]:
+            source = _raiser_source(event_params, kind)
+            namespace: dict[str, Any] = {}
+            # Name the code after the event so tracebacks through the raisers are readable
+            exec(compile(source, f"<event raisers for '{name}'>", "exec"), namespace)
+            sync_raiser, async_raiser, rebind = namespace["__make_raisers"](
+                f"Error in event '{name}'", event_callbacks.snapshots(), event_callbacks.warn_async,
+                _log.exception, asyncio.gather, iter, len, isinstance, Exception, BaseException,
+                _call_all, _call_all_guarded
+            )
+            event_callbacks.add_rebinder(rebind)
+            for raiser in (sync_raiser, async_raiser):
+                if raiser is not None:
+                    raiser._rebind = rebind
+
+            # Parameter names are real, the signature additionally carries the annotations
+            if sync_raiser is not None:
+                if signature is not None:
+                    sync_raiser.__signature__ = signature
+                sync_raiser.__name__ = sync_raiser.__qualname__ = f"raise_{name}"
+                sync_raiser.__doc__ = f"Trigger the {name} event (async callbacks are not awaited)"
+            if async_raiser is not None:
+                if signature is not None:
+                    async_raiser.__signature__ = signature
+                async_raiser.__name__ = async_raiser.__qualname__ = f"raise_{name}_async"
+                async_raiser.__doc__ = f"Asynchronously trigger the {name} event (supports sync/async callbacks)"
+            return sync_raiser, async_raiser
+
         # Add event decorator and trigger functions to module globals
-        module_globals[event_name] = create_decorator(event_name)
-        module_globals[f"raise_{event_name}_async"] = create_async_raiser(event_name, params)
-        module_globals[f"raise_{event_name}"] = create_sync_raiser(event_name, params)
+        module_globals[event_name] = create_decorator(event_name, event_callbacks)
+        sync_raiser, async_raiser = create_raisers(event_name, params, kind, signature, event_callbacks)
+        # Raisers left over from an earlier generation with another kind are removed
+        for raiser_name, raiser in ((f"raise_{event_name}_async", async_raiser), (f"raise_{event_name}", sync_raiser)):
+            if raiser is not None:
+                module_globals[raiser_name] = raiser
+            else:
+                module_globals.pop(raiser_name, None)
+
+
+def unregister_event_callback(event_name: str, func: EventOf) -> None:
+    """
+    Unregister a callback function (sync/async) from an event.
+
+    :param event_name: Name of the event the callback was registered for
+    :param func: The callback function to remove (its first registration is removed)
+    :raises ValueError: If the callback is not registered for the event
+    """
+    event_callbacks = _event_callbacks.get(event_name)
+    if event_callbacks is None or not event_callbacks.unregister(func):
+        raise ValueError(f"Callback {func!r} is not registered for event '{event_name}'")
 
 
 def clear_event_registry() -> None:
     """Clear the event registry"""
-    _event_registry.clear()
+    # Empty the lists in place: the generated decorators hold references to them
+    for event_callbacks in _event_callbacks.values():
+        event_callbacks.clear()
 
 
 def get_event_registry() -> _EventRegistry:
-    """Get the event registry (includes sync/async callbacks)"""
-    return _event_registry
\ No newline at end of file
+    """Get a read-only view of the event registry (includes sync/async callbacks)"""
+    return MappingProxyType({
+        event_name: event_callbacks.registered() for event_name, event_callbacks in _event_callbacks.items()
+    })
\ No newline at end of file
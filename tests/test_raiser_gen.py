@@ -0,0 +1,338 @@
+import asyncio
+import gc
+import inspect
+import os
+import subprocess
+import sys
+import threading
+import unittest
+import warnings
+from typing import Any
+
+from event_raiser_gen import (
+    EventSpec, clear_event_registry, generate_event_raisers, get_event_registry, unregister_event_callback
+)
+from event_raiser_gen.raiser_gen import _event_callbacks
+
+_LOGGER = "event_raiser_gen.raiser_gen"
+
+
+class RaiserGenTest(unittest.TestCase):
+    def setUp(self) -> None:
+        clear_event_registry()
+        self.ns: dict[str, Any] = {}
+        generate_event_raisers({"ev": [("a", int), ("b", str)]}, self.ns)
+
+    def tearDown(self) -> None:
+        clear_event_registry()
+
+    def test_positional_and_keyword_raises(self) -> None:
+        calls = []
+        self.ns["ev"](lambda x, y: calls.append((x, y)))
+        self.ns["raise_ev"](1, "p")
+        self.ns["raise_ev"](b="k", a=2)
+        self.assertEqual(calls, [(1, "p"), (2, "k")])
+
+    def test_guarded_errors_are_logged_and_dispatch_resumes(self) -> None:
+        calls = []
+
+        @self.ns["ev"]
+        def failing(a: int, b: str) -> None:
+            raise ValueError("boom")
+
+        self.ns["ev"](lambda a, b: calls.append(a))
+        with self.assertLogs(_LOGGER, "ERROR") as logs:
+            self.ns["raise_ev"](1, "x")
+        self.assertEqual(calls, [1])
+        self.assertEqual(len(logs.records), 1)
+        self.assertEqual(logs.records[0].getMessage(), "Error in event 'ev'")
+
+    def test_many_callbacks_dispatch_in_order(self) -> None:
+        # Enough callbacks to select the compiled loops when they are built
+        calls = []
+        for i in range(12):
+            self.ns["ev"](lambda a, b, i=i: calls.append(i))
+
+        @self.ns["ev"]
+        def failing(a: int, b: str) -> None:
+            raise ValueError("boom")
+
+        self.ns["ev"](lambda a, b: calls.append("last"))
+        with self.assertLogs(_LOGGER, "ERROR"):
+            self.ns["raise_ev"](1, "x")
+        self.assertEqual(calls, [*range(12), "last"])
+
+    def test_safe_callback_errors_propagate(self) -> None:
+        @self.ns["ev"](safe=True)
+        def failing(a: int, b: str) -> None:
+            raise KeyError("safe")
+
+        with self.assertRaises(KeyError):
+            self.ns["raise_ev"](1, "x")
+
+    def test_async_raiser_runs_sync_and_async_callbacks(self) -> None:
+        calls = []
+
+        @self.ns["ev"]
+        async def async_callback(a: int, b: str) -> None:
+            await asyncio.sleep(0)
+            calls.append(("async", a))
+
+        @self.ns["ev"]
+        async def failing(a: int, b: str) -> None:
+            raise ValueError("boom")
+
+        self.ns["ev"](lambda a, b: calls.append(("sync", a)))
+        with self.assertLogs(_LOGGER, "ERROR"):
+            asyncio.run(self.ns["raise_ev_async"](3, "x"))
+        self.assertEqual(calls, [("sync", 3), ("async", 3)])
+
+    def test_async_safe_errors_propagate_after_all_callbacks_finish(self) -> None:
+        calls = []
+
+        @self.ns["ev"](safe=True)
+        async def failing(a: int, b: str) -> None:
+            raise KeyError("safe")
+
+        @self.ns["ev"]
+        async def slow(a: int, b: str) -> None:
+            await asyncio.sleep(0.05)
+            calls.append("slow")
+
+        async def raise_and_record() -> None:
+            try:
+                await self.ns["raise_ev_async"](1, "x")
+            except KeyError:
+                calls.append("caught")
+
+        asyncio.run(raise_and_record())
+        self.assertEqual(calls, ["slow", "caught"])
+
+    def test_async_coroutines_are_closed_when_a_safe_callback_cannot_be_called(self) -> None:
+        calls = []
+
+        @self.ns["ev"](safe=True)
+        async def callback(a: int, b: str) -> None:
+            calls.append(a)
+
+        @self.ns["ev"](safe=True)
+        async def wrong_arity(a: int) -> None: ...
+
+        with warnings.catch_warnings(record=True) as caught:
+            warnings.simplefilter("always")
+            with self.assertRaises(TypeError):
+                asyncio.run(self.ns["raise_ev_async"](1, "x"))
+            gc.collect()
+        self.assertEqual(calls, [])
+        self.assertEqual([w for w in caught if issubclass(w.category, RuntimeWarning)], [])
+
+    def test_sync_raiser_skips_async_callbacks(self) -> None:
+        @self.ns["ev"]
+        async def async_callback(a: int, b: str) -> None: ...
+
+        with self.assertLogs(_LOGGER, "WARNING") as logs:
+            self.ns["raise_ev"](1, "x")
+            self.ns["raise_ev"](2, "x")
+        self.assertEqual(len(logs.records), 1)
+        # Clearing the registry re-arms the warning
+        clear_event_registry()
+        self.ns["ev"](async_callback)
+        with self.assertLogs(_LOGGER, "WARNING"):
+            self.ns["raise_ev"](3, "x")
+
+    def test_clear_event_registry(self) -> None:
+        calls = []
+        self.ns["ev"](lambda a, b: calls.append(a))
+        clear_event_registry()
+        self.ns["raise_ev"](1, "x")
+        self.assertEqual(calls, [])
+        self.assertEqual(len(get_event_registry()["ev"]), 0)
+        self.ns["ev"](lambda a, b: calls.append(a))
+        self.ns["raise_ev"](2, "x")
+        self.assertEqual(calls, [2])
+
+    def test_unregister_event_callback(self) -> None:
+        calls = []
+
+        def callback(a: int, b: str) -> None:
+            calls.append(a)
+
+        @self.ns["ev"]
+        async def async_callback(a: int, b: str) -> None:
+            calls.append(-a)
+
+        self.ns["ev"](callback)
+        unregister_event_callback("ev", callback)
+        unregister_event_callback("ev", async_callback)
+        self.ns["raise_ev"](1, "x")
+        asyncio.run(self.ns["raise_ev_async"](2, "x"))
+        self.assertEqual(calls, [])
+        self.assertEqual(get_event_registry()["ev"], ())
+        with self.assertRaises(ValueError):
+            unregister_event_callback("ev", callback)
+        with self.assertRaises(ValueError):
+            unregister_event_callback("missing", callback)
+
+    def test_unregister_removes_the_matching_registration(self) -> None:
+        def callback(a: int, b: str) -> None:
+            raise KeyError("boom")
+
+        self.ns["ev"](callback)
+        self.ns["ev"](safe=True)(callback)
+        unregister_event_callback("ev", callback)
+        self.assertEqual(get_event_registry()["ev"], (callback,))
+        # The remaining registration is the safe one, so its error propagates
+        with self.assertRaises(KeyError):
+            self.ns["raise_ev"](1, "x")
+
+    def test_concurrent_registrations_are_all_dispatched(self) -> None:
+        calls = []
+        switch_interval = sys.getswitchinterval()
+        sys.setswitchinterval(1e-6)
+        try:
+            threads = [
+                threading.Thread(target=lambda i=i: [self.ns["ev"](lambda a, b, i=i: calls.append(i))
+                                                     for _ in range(50)])
+                for i in range(8)
+            ]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+        finally:
+            sys.setswitchinterval(switch_interval)
+        self.ns["raise_ev"](1, "x")
+        self.assertEqual(len(calls), 8 * 50)
+
+    def test_callbacks_registered_during_a_raise_run_from_the_next_raise(self) -> None:
+        calls = []
+
+        @self.ns["ev"](safe=True)
+        def registering(a: int, b: str) -> None:
+            if a == 1:
+                self.ns["ev"](lambda a, b: calls.append(("sync", a)))
+
+                @self.ns["ev"]
+                async def late(a: int, b: str) -> None:
+                    calls.append(("async", a))
+
+        asyncio.run(self.ns["raise_ev_async"](1, "x"))
+        self.assertEqual(calls, [])
+        asyncio.run(self.ns["raise_ev_async"](2, "x"))
+        self.assertEqual(calls, [("sync", 2), ("async", 2)])
+
+    def test_regenerated_raisers_release_their_rebinders(self) -> None:
+        for _ in range(5):
+            generate_event_raisers({"ev": [("a", int), ("b", str)]}, self.ns)
+        kept_async_raiser = self.ns["raise_ev_async"]
+        generate_event_raisers({"ev": [("a", int), ("b", str)]}, self.ns)
+        gc.collect()
+        # The current raisers plus the async raiser still referenced above
+        self.assertEqual(len(_event_callbacks["ev"].rebinders), 2)
+        calls = []
+        self.ns["ev"](lambda a, b: calls.append(a))
+        asyncio.run(kept_async_raiser(1, "x"))
+        self.ns["raise_ev"](2, "x")
+        self.assertEqual(calls, [1, 2])
+
+    def test_event_registry_is_read_only(self) -> None:
+        registry = get_event_registry()
+        with self.assertRaises(TypeError):
+            registry["ev"] = ()  # type: ignore[index]
+        self.assertIsInstance(registry["ev"], tuple)
+
+    def test_sync_kind_rejects_coroutine_functions(self) -> None:
+        generate_event_raisers({"sync_ev": EventSpec([("a", int)], kind="sync")}, self.ns)
+        self.assertNotIn("raise_sync_ev_async", self.ns)
+
+        async def async_callback(a: int) -> None: ...
+
+        with self.assertRaises(TypeError):
+            self.ns["sync_ev"](async_callback)
+
+    def test_async_kind_has_no_sync_raiser(self) -> None:
+        generate_event_raisers({"async_ev": EventSpec([("a", int)], kind="async")}, self.ns)
+        self.assertIn("raise_async_ev_async", self.ns)
+        self.assertNotIn("raise_async_ev", self.ns)
+
+    def test_regenerating_with_another_kind(self) -> None:
+        async def async_callback(a: int, b: str) -> None: ...
+
+        generate_event_raisers({"ev": EventSpec([("a", int), ("b", str)], kind="async")}, self.ns)
+        self.assertNotIn("raise_ev", self.ns)
+        generate_event_raisers({"ev": EventSpec([("a", int), ("b", str)], kind="sync")}, self.ns)
+        self.assertNotIn("raise_ev_async", self.ns)
+        self.assertIn("raise_ev", self.ns)
+        generate_event_raisers({"ev": [("a", int), ("b", str)]}, self.ns)
+        self.ns["ev"](async_callback)
+        with self.assertRaises(TypeError):
+            generate_event_raisers({"ev": EventSpec([("a", int), ("b", str)], kind="sync")}, self.ns)
+        unregister_event_callback("ev", async_callback)
+        kept_decorator = self.ns["ev"]
+        generate_event_raisers({"ev": EventSpec([("a", int), ("b", str)], kind="sync")}, self.ns)
+        # Decorators of earlier generations follow the new kind as well
+        with self.assertRaises(TypeError):
+            kept_decorator(async_callback)
+
+    def test_raiser_signatures(self) -> None:
+        for raiser_name in ("raise_ev", "raise_ev_async"):
+            parameters = inspect.signature(self.ns[raiser_name]).parameters
+            self.assertEqual([(p.name, p.annotation) for p in parameters.values()], [("a", int), ("b", str)])
+        ns: dict[str, Any] = {}
+        generate_event_raisers({"ev": [("a", int), ("b", str)]}, ns, with_signatures=False)
+        for raiser_name in ("raise_ev", "raise_ev_async"):
+            self.assertEqual(str(inspect.signature(ns[raiser_name])), "(a, b)")
+
+    def test_events_with_identical_parameters_share_a_signature(self) -> None:
+        generate_event_raisers({"other": [("a", int), ("b", str)]}, self.ns)
+        self.assertIs(self.ns["raise_other"].__signature__, self.ns["raise_ev"].__signature__)
+        self.assertIs(self.ns["raise_other_async"].__signature__, self.ns["raise_ev"].__signature__)
+
+    def test_unhashable_annotations_still_get_a_signature(self) -> None:
+        annotation = {"unit": "ms"}
+        generate_event_raisers({"timed": [("elapsed", annotation)]}, self.ns)
+        parameters = inspect.signature(self.ns["raise_timed"]).parameters
+        self.assertIs(parameters["elapsed"].annotation, annotation)
+
+    def test_signatures_disabled_by_environment_variable(self) -> None:
+        code = ("import inspect\n"
+                "from event_raiser_gen import generate_event_raisers\n"
+                "ns = {}\n"
+                "generate_event_raisers({'ev': [('a', int), ('b', str)]}, ns)\n"
+                "print(inspect.signature(ns['raise_ev']), inspect.signature(ns['raise_ev_async']))\n")
+        root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        env = {**os.environ, "EVENT_RAISER_NO_SIGNATURE": "1",
+               "PYTHONPATH": os.pathsep.join(filter(None, (root, os.environ.get("PYTHONPATH"))))}
+        result = subprocess.run([sys.executable, "-c", code], env=env, capture_output=True, text=True, check=True)
+        self.assertEqual(result.stdout.strip(), "(a, b) (a, b)")
+
+    def test_invalid_parameter_names_are_rejected(self) -> None:
+        for params in ([("class", int)], [("__x", int)], [("a b", int)], [("a", int), ("a", int)]):
+            with self.assertRaises(ValueError):
+                generate_event_raisers({"bad": params}, {}, with_signatures=False)
+
+    def test_parameters_named_like_builtins(self) -> None:
+        for name in ("print", "id", "Exception", "BaseException", "len", "iter", "isinstance"):
+            ns: dict[str, Any] = {}
+            generate_event_raisers({f"ev_{name}": [(name, int)]}, ns)
+            calls = []
+
+            @ns[f"ev_{name}"]
+            def failing(value: int) -> None:
+                raise ValueError("boom")
+
+            ns[f"ev_{name}"](lambda value: calls.append(value))
+
+            @ns[f"ev_{name}"]
+            async def async_callback(value: int) -> None:
+                calls.append(-value)
+
+            with self.assertLogs(_LOGGER, "ERROR"):
+                ns[f"raise_ev_{name}"](1)
+            with self.assertLogs(_LOGGER, "ERROR"):
+                asyncio.run(ns[f"raise_ev_{name}_async"](2))
+            self.assertEqual(calls, [1, 2, -2])
+
+
+if __name__ == "__main__":
+    unittest.main()